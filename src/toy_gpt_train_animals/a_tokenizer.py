@@ -11,6 +11,8 @@ Notes:
 - Real language models often use subword tokenizers (breaking a word into subparts).
 """
 
+from collections.abc import Mapping, Sequence
+from functools import cache
 import logging
 from pathlib import Path
 from typing import Final
@@ -18,7 +20,13 @@ from typing import Final
 from datafun_toolkit.logger import get_logger, log_header
 from toy_gpt_train.a_tokenizer import SimpleTokenizer
 
-__all__ = ["SimpleTokenizer", "CORPUS_DIR", "DEFAULT_CORPUS_PATH"]
+__all__ = [
+    "SimpleTokenizer",
+    "CORPUS_DIR",
+    "DEFAULT_CORPUS_PATH",
+    "get_default_tokens",
+    "tokens_to_ids",
+]
 
 
 LOG: logging.Logger = get_logger("TOKEN", level="INFO")
@@ -28,21 +36,38 @@ CORPUS_DIR: Final[Path] = BASE_DIR / "corpus"
 DEFAULT_CORPUS_PATH: Final[Path] = CORPUS_DIR / "001_animals.txt"
 
 
+@cache
+def get_default_tokens() -> tuple[str, ...]:
+    """Return the tokens of the default corpus, tokenizing it once per process.
+
+    The result is a tuple so the cached value cannot be mutated by callers.
+    """
+    return tuple(SimpleTokenizer(corpus_path=DEFAULT_CORPUS_PATH).get_tokens())
+
+
+def tokens_to_ids(tokens: Sequence[str], token_to_id: Mapping[str, int]) -> list[int]:
+    """Convert token strings to integer IDs in a single lookup pass.
+
+    Raises:
+        KeyError: If a token is missing from token_to_id.
+    """
+    return list(map(token_to_id.__getitem__, tokens))
+
+
 def main() -> None:
     """Demonstrate tokenization on the default corpus file."""
     import statistics
 
     log_header(LOG, "Tokenizer Demo")
 
-    tokenizer: SimpleTokenizer = SimpleTokenizer(corpus_path=DEFAULT_CORPUS_PATH)
-    tokens: list[str] = tokenizer.get_tokens()
+    tokens: tuple[str, ...] = get_default_tokens()
 
-    LOG.info(f"First 10 tokens: {tokens[:10]}")
-    LOG.info(f"Total number of tokens: {len(tokens)}")
+    LOG.info("First 10 tokens: %s", list(tokens[:10]))
+    LOG.info("Total number of tokens: %d", len(tokens))
 
     if tokens:
         avg_token_length: float = statistics.mean(len(token) for token in tokens)
-        LOG.info(f"Average token length: {avg_token_length:.2f}")
+        LOG.info("Average token length: %.2f", avg_token_length)
     else:
         LOG.info("No tokens available to calculate average length.")
 
@@ -12,32 +12,39 @@ This module bridges raw tokens and numerical representations
 required by statistical and neural models.
 """
 
+from functools import cache
 import logging
 
 from datafun_toolkit.logger import get_logger, log_header
 from toy_gpt_train.b_vocab import Vocabulary
 
-__all__ = ["Vocabulary"]
+__all__ = ["Vocabulary", "get_default_vocab"]
 
 LOG: logging.Logger = get_logger("VOCAB", level="INFO")
 
 
+@cache
+def get_default_vocab() -> Vocabulary:
+    """Return the vocabulary of the default corpus, building it once per process."""
+    # Local import keeps modules decoupled and avoids import work unless needed.
+    from toy_gpt_train_animals.a_tokenizer import get_default_tokens
+
+    return Vocabulary(list(get_default_tokens()))
+
+
 def main() -> None:
     """Demonstrate vocabulary construction from the project corpus."""
     log_header(LOG, "Vocabulary Demo")
 
     # Local import keeps modules decoupled and avoids import work unless needed.
-    from toy_gpt_train_animals.a_tokenizer import DEFAULT_CORPUS_PATH, SimpleTokenizer
-
-    log_header(LOG, "Vocabulary Demo")
+    from toy_gpt_train_animals.a_tokenizer import get_default_tokens
 
-    # 1) Tokenize - start with corpus and turn it into tokens
-    tokenizer: SimpleTokenizer = SimpleTokenizer(corpus_path=DEFAULT_CORPUS_PATH)
-    tokens: list[str] = tokenizer.get_tokens()
+    # 1) Tokenize - start with corpus and turn it into tokens (cached per process)
+    tokens: tuple[str, ...] = get_default_tokens()
 
     # 2) Build vocabulary (the set of unique tokens) from the list of tokens
-    vocab = Vocabulary(tokens)
-    LOG.info(f"Vocabulary size: {vocab.vocab_size()}")
+    vocab: Vocabulary = get_default_vocab()
+    LOG.info("Vocabulary size: %d", vocab.vocab_size())
 
     if tokens:
         sample_token = tokens[0]
@@ -45,9 +52,10 @@ def main() -> None:
         sample_freq = vocab.get_token_frequency(sample_token)
 
         LOG.info(
-            f"Sample token: {sample_token!r} "
-            f"| ID: {sample_id} "
-            f"| Frequency: {sample_freq}"
+            "Sample token: %r | ID: %s | Frequency: %d",
+            sample_token,
+            sample_id,
+            sample_freq,
         )
     else:
         LOG.info("No tokens found; cannot demonstrate vocabulary lookup.")
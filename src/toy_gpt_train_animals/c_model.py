@@ -41,34 +41,88 @@ This model is intentionally simple:
 Training is handled in a different module.
 """
 
+from array import array
+from collections.abc import Sequence
 import logging
+import math
 
 from datafun_toolkit.logger import get_logger, log_header
-from toy_gpt_train.c_model import SimpleNextTokenModel
 
-__all__ = ["SimpleNextTokenModel"]
+__all__ = ["SimpleNextTokenModel", "stable_softmax"]
 
 LOG: logging.Logger = get_logger("MODEL", level="INFO")
 
 
+def stable_softmax(scores: Sequence[float]) -> list[float]:
+    """Convert raw scores into probabilities using a numerically stable softmax.
+
+    Subtracting the largest score before exponentiating (log-sum-exp trick)
+    keeps every exponent <= 0, so large scores cannot overflow.
+    """
+    max_score: float = max(scores)
+    exps: list[float] = [math.exp(score - max_score) for score in scores]
+    inv_total: float = 1.0 / sum(exps)
+    return [e * inv_total for e in exps]
+
+
+class SimpleNextTokenModel:
+    """Context-2 next-token model backed by a single weight table.
+
+    The table is stored flattened as vocab_size * vocab_size rows
+    (one row per (previous, current) context, row-major by previous token),
+    each holding vocab_size scores for the next token.
+
+    Each row is a compact float32 array rather than a list of Python floats:
+    the table takes a fraction of the memory, and float32 precision is
+    plenty for a demo model.
+
+    Attributes:
+        vocab_size: Number of tokens in the vocabulary (V).
+        weights: V*V rows of V float32 scores, each row its own array.
+    """
+
+    def __init__(self, vocab_size: int) -> None:
+        """Initialize the model with an all-zero weight table."""
+        self.vocab_size: int = vocab_size
+        zero_row: array[float] = array("f", [0.0]) * vocab_size
+        self.weights: list[array[float]] = [
+            array("f", zero_row) for _ in range(vocab_size * vocab_size)
+        ]
+
+    def row_index(self, previous_id: int, current_id: int) -> int:
+        """Return the flattened row index for a (previous, current) context."""
+        return previous_id * self.vocab_size + current_id
+
+    def forward_logits(self, previous_id: int, current_id: int) -> array[float]:
+        """Return the raw scores for the next token (a view, not a copy).
+
+        Useful when only the ranking matters (for example, argmax), because
+        argmax(scores) == argmax(softmax(scores)). Callers must not mutate it.
+        """
+        return self.weights[self.row_index(previous_id, current_id)]
+
+    def forward(self, previous_id: int, current_id: int) -> list[float]:
+        """Return next-token probabilities for a (previous, current) context."""
+        return stable_softmax(self.forward_logits(previous_id, current_id))
+
+
 def main() -> None:
     """Demonstrate a forward pass of the simple context-2 model."""
     # Local imports keep modules decoupled.
-    from toy_gpt_train_animals.a_tokenizer import DEFAULT_CORPUS_PATH, SimpleTokenizer
-    from toy_gpt_train_animals.b_vocab import Vocabulary
+    from toy_gpt_train_animals.a_tokenizer import get_default_tokens
+    from toy_gpt_train_animals.b_vocab import Vocabulary, get_default_vocab
 
     log_header(LOG, "Simple Next-Token Model Demo (Context-2)")
 
-    # Step 1: Tokenize input text.
-    tokenizer: SimpleTokenizer = SimpleTokenizer(corpus_path=DEFAULT_CORPUS_PATH)
-    tokens: list[str] = tokenizer.get_tokens()
+    # Step 1: Tokenize input text (cached per process).
+    tokens: tuple[str, ...] = get_default_tokens()
 
     if len(tokens) < 2:
         LOG.info("Need at least two tokens for context-2 demonstration.")
         return
 
-    # Step 2: Build vocabulary.
-    vocab: Vocabulary = Vocabulary(tokens)
+    # Step 2: Build vocabulary (cached per process).
+    vocab: Vocabulary = get_default_vocab()
 
     # Step 3: Initialize model.
     model: SimpleNextTokenModel = SimpleNextTokenModel(vocab_size=vocab.vocab_size())
@@ -88,13 +142,23 @@ def main() -> None:
     probs: list[float] = model.forward(previous_id, current_id)
 
     # Step 6: Inspect results.
+    # The listing below formats one line per vocabulary token, so skip it
+    # entirely when INFO is disabled (for example, under a quieter test run).
+    if not LOG.isEnabledFor(logging.INFO):
+        return
+
     LOG.info(
-        f"Input tokens: {previous_token!r} (ID {previous_id}), {current_token!r} (ID {current_id})"
+        "Input tokens: %r (ID %d), %r (ID %d)",
+        previous_token,
+        previous_id,
+        current_token,
+        current_id,
+    )
+    lines: str = "\n".join(
+        f"  {vocab.get_id_token(idx)!r} (ID {idx}) -> {prob:.4f}"
+        for idx, prob in enumerate(probs)
     )
-    LOG.info("Output probabilities for next token:")
-    for idx, prob in enumerate(probs):
-        tok: str | None = vocab.get_id_token(idx)
-        LOG.info(f"  {tok!r} (ID {idx}) -> {prob:.4f}")
+    LOG.info("Output probabilities for next token:\n%s", lines)
 
 
 if __name__ == "__main__":
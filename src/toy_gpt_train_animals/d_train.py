@@ -12,7 +12,8 @@ Responsibilities:
 
 Concepts:
 - context-2: predict the next token using (previous token, current token)
-- epoch: one complete pass through all training pairs
+- epoch: one complete pass through all training pairs; pairs are grouped by
+  context, and each observed context row takes one step along its average gradient
 - softmax: converts raw scores into probabilities (so predictions sum to 1)
 - cross-entropy loss: measures how well predicted probabilities match the correct next token
 - gradient descent: iterative weight updates to reduce prediction error
@@ -23,81 +24,284 @@ Notes:
 - This remains intentionally simple: no deep learning framework, no Transformer.
 - The model generalizes n-gram training by expanding the context window.
 - Training updates weight rows associated with the observed context-2 pattern.
+- Each epoch is one full-batch step: pairs are grouped by context row,
+  and each observed row gets one softmax and one update using the row's
+  average gradient (probabilities minus the observed next-token frequencies).
+  Averaging per row keeps the step size independent of how often a context
+  occurs, so frequent contexts cannot overshoot.
+- 02_model_weights.bin is a raw float32 copy of the weights CSV that lets
+  e_infer.py start without parsing text; the CSV remains the inspectable source,
+  and the copy records the CSV's SHA-256 so edits to the CSV are not masked.
 - token_embeddings.csv is a visualization-friendly projection for levels 100-400;
   in later repos (500+), embeddings become a first-class learned table.
 """
 
+from array import array
+import hashlib
+import json
 import logging
+import math
 from pathlib import Path
-from typing import Final
+import sys
+from typing import TYPE_CHECKING, Final, cast
 
 from datafun_toolkit.logger import get_logger, log_header
-from toy_gpt_train.c_model import SimpleNextTokenModel
-from toy_gpt_train.d_train import (
-    make_training_pairs,
-    row_labeler_context2,
-    train_model,
-)
+from toy_gpt_train.d_train import row_labeler_context2
 from toy_gpt_train.io_artifacts import (
     write_artifacts,
     write_training_log,
 )
-from toy_gpt_train.math_training import argmax
 
-from toy_gpt_train_animals.a_tokenizer import DEFAULT_CORPUS_PATH, SimpleTokenizer
-from toy_gpt_train_animals.b_vocab import Vocabulary
+from toy_gpt_train_animals.a_tokenizer import (
+    DEFAULT_CORPUS_PATH,
+    get_default_tokens,
+    tokens_to_ids,
+)
+from toy_gpt_train_animals.b_vocab import Vocabulary, get_default_vocab
+from toy_gpt_train_animals.c_model import SimpleNextTokenModel
 
-type Context2 = tuple[int, int]
-type Context2Pair = tuple[Context2, int]
+if TYPE_CHECKING:
+    from toy_gpt_train.c_model import SimpleNextTokenModel as UpstreamModel
 
 LOG: logging.Logger = get_logger("TRAIN", level="INFO")
 
 BASE_DIR: Final[Path] = Path(__file__).resolve().parents[2]
 OUTPUTS_DIR: Final[Path] = BASE_DIR / "outputs"
 TRAIN_LOG_PATH: Final[Path] = OUTPUTS_DIR / "train_log.csv"
+ARTIFACTS_DIR: Final[Path] = BASE_DIR / "artifacts"
+WEIGHTS_PATH: Final[Path] = ARTIFACTS_DIR / "02_model_weights.csv"
+WEIGHTS_BIN_PATH: Final[Path] = ARTIFACTS_DIR / "02_model_weights.bin"
+META_PATH: Final[Path] = ARTIFACTS_DIR / "00_meta.json"
+
+EPOCH_DEFINITION: Final[str] = (
+    "One epoch is a complete pass through all training pairs. "
+    "Pairs are grouped by context, and each observed context row takes one "
+    "gradient update using the average gradient of its pairs."
+)
+
+
+def write_epoch_definition(meta_path: Path) -> None:
+    """Record this repo's epoch definition in the meta artifact.
+
+    The shared write_artifacts describes per-pair updates; this training
+    loop updates once per context row, so the description is replaced.
+    """
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["training"]["epoch_definition"] = EPOCH_DEFINITION
+    meta_path.write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+
+
+def write_model_weights_bin(
+    path: Path,
+    model: SimpleNextTokenModel,
+    *,
+    source_path: Path,
+) -> None:
+    """Write the weight table as raw little-endian float32 values.
+
+    The file starts with the SHA-256 digest of source_path (the weights CSV
+    written from the same model), so e_infer.py can tell whether the copy is
+    still current. Values follow row-major (the same row order as the CSV):
+    vocab_size**3 floats.
+    """
+    digest: bytes = hashlib.sha256(source_path.read_bytes()).digest()
+    flat: array[float] = array("f")
+    for row in model.weights:
+        flat.extend(row)
+    if sys.byteorder != "little":
+        flat.byteswap()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(digest + flat.tobytes())
+
+
+def group_context_targets(
+    row_ids: list[int],
+    next_ids: list[int],
+) -> dict[int, dict[int, int]]:
+    """Group training pairs by context row.
+
+    Returns:
+        A mapping from each observed context row to a histogram
+        {next_id: count} of the tokens that followed it, ordered by row index.
+        Iterating in that order walks the weight table front to back
+        instead of jumping between rows in corpus order.
+    """
+    groups: dict[int, dict[int, int]] = {}
+    for row_id, next_id in zip(row_ids, next_ids, strict=True):
+        targets: dict[int, int] = groups.setdefault(row_id, {})
+        targets[next_id] = targets.get(next_id, 0) + 1
+    return dict(sorted(groups.items()))
+
+
+# One training context: (weight row, next-token histogram,
+# learning_rate * next-token frequencies as a dense vocab-length list).
+type ContextGroup = tuple[array[float], dict[int, int], list[float]]
+
+
+def _train_epoch(
+    groups: list[ContextGroup],
+    learning_rate: float,
+) -> tuple[float, int]:
+    """Run one full-batch epoch as a single fused pass per context row.
+
+    For each row: shift by the max score, exponentiate, read loss and
+    accuracy off the target histogram, and apply the gradient in place,
+    without building a separate probability list.
+
+    The softmax normalizer is computed once per row as a log-sum-exp,
+    lse = max + log(sum(exp(score - max))), so the loss for any target is
+    simply lse - score[target], no matter how many pairs share the row.
+
+    Returns:
+        (summed cross-entropy loss, number of correct predictions)
+    """
+    exp = math.exp
+    log = math.log
+    total_loss: float = 0.0
+    correct: int = 0
+
+    for row, targets, lr_freqs in groups:
+        max_score: float = max(row)
+        exps: list[float] = [exp(score - max_score) for score in row]
+        sum_exps: float = sum(exps)
+        inv_sum: float = 1.0 / sum_exps
+        log_sum_exp: float = max_score + log(sum_exps)
+
+        for next_id, count in targets.items():
+            total_loss += count * (log_sum_exp - row[next_id])
+
+        # argmax of the raw scores equals argmax of the probabilities, and
+        # every pair in this row shares that prediction: the pairs it gets
+        # right are exactly the histogram count for the predicted token.
+        pred: int = row.index(max_score)
+        correct += targets.get(pred, 0)
+
+        # row -= learning_rate * (probs - histogram / total)
+        scale: float = learning_rate * inv_sum
+        for j, e in enumerate(exps):
+            row[j] -= scale * e - lr_freqs[j]
+
+    return total_loss, correct
+
+
+def train_model(
+    model: SimpleNextTokenModel,
+    prev_ids: list[int],
+    curr_ids: list[int],
+    next_ids: list[int],
+    learning_rate: float,
+    epochs: int,
+    log_every: int = 1,
+) -> list[dict[str, float]]:
+    """Train the model with one full-batch gradient step per epoch.
+
+    Pairs that share a (previous, current) context hit the same weight row,
+    so they are grouped once up front. Each epoch then computes one softmax
+    per unique context and applies that row's average cross-entropy gradient
+    (probabilities minus the observed next-token frequencies).
+    Averaging per row means a context seen 1000 times takes the same size
+    step as one seen once, so learning_rate is stable for any corpus size.
+
+    Args:
+        model: Model whose weights are updated in place.
+        prev_ids: Previous-token ID for each training pair.
+        curr_ids: Current-token ID for each training pair.
+        next_ids: Target next-token ID for each training pair.
+        learning_rate: Step size for gradient descent.
+        epochs: Number of full passes over the training pairs.
+        log_every: Record (and log) metrics every this many epochs.
+            The first and last epochs are always recorded.
+
+    Returns:
+        One dict per recorded epoch with keys: epoch, avg_loss, accuracy.
+        With no training pairs, avg_loss is NaN and accuracy is 0.0.
+
+    Raises:
+        ValueError: If log_every is less than 1.
+    """
+    if log_every < 1:
+        raise ValueError(f"log_every must be at least 1, got {log_every}")
+
+    row_ids: list[int] = [
+        model.row_index(prev, curr)
+        for prev, curr in zip(prev_ids, curr_ids, strict=True)
+    ]
+    num_pairs: int = len(next_ids)
+
+    # Everything that does not change between epochs is prepared once here.
+    groups: list[ContextGroup] = []
+    for row_id, targets in group_context_targets(row_ids, next_ids).items():
+        total: int = sum(targets.values())
+        lr_freqs: list[float] = [0.0] * model.vocab_size
+        for next_id, count in targets.items():
+            lr_freqs[next_id] = learning_rate * count / total
+        groups.append((model.weights[row_id], targets, lr_freqs))
+
+    history: list[dict[str, float]] = []
+    for epoch in range(1, epochs + 1):
+        total_loss, correct = _train_epoch(groups, learning_rate)
+        if epoch % log_every and epoch not in (1, epochs):
+            continue
+
+        avg_loss: float = total_loss / num_pairs if num_pairs else float("nan")
+        accuracy: float = correct / num_pairs if num_pairs else 0.0
+        history.append({"epoch": epoch, "avg_loss": avg_loss, "accuracy": accuracy})
+        LOG.info(
+            "Epoch %d/%d | avg_loss=%.4f | accuracy=%.3f",
+            epoch,
+            epochs,
+            avg_loss,
+            accuracy,
+        )
+
+    return history
 
 
 def main() -> None:
     """Run a simple training demo end-to-end."""
     log_header(LOG, "Training Demo: Next-Token Softmax Regression")
 
-    # Step 1: Load and tokenize the corpus.
-    tokenizer: SimpleTokenizer = SimpleTokenizer(corpus_path=DEFAULT_CORPUS_PATH)
-    tokens: list[str] = tokenizer.get_tokens()
+    # Step 1: Load and tokenize the corpus (cached per process).
+    tokens: tuple[str, ...] = get_default_tokens()
 
     if len(tokens) < 3:
         LOG.error("Need at least 3 tokens for context-2 training (t-1, t -> next).")
         return
 
-    # Step 2: Build vocabulary (maps tokens <-> integer IDs).
-    vocab: Vocabulary = Vocabulary(tokens)
+    # Step 2: Build vocabulary (maps tokens <-> integer IDs; cached per process).
+    vocab: Vocabulary = get_default_vocab()
     vocab_size: int = vocab.vocab_size()
 
     # Step 3: Convert token strings to integer IDs for training.
-    token_ids: list[int] = []
-    for tok in tokens:
-        tok_id: int | None = vocab.get_token_id(tok)
-        if tok_id is None:
-            LOG.error(f"Token not found in vocabulary: {tok}")
-            return
-        token_ids.append(tok_id)
-
-    # Step 4: Create training pairs (context-2 -> next).
-    pairs: list[Context2Pair] = make_training_pairs(token_ids)
-    LOG.info(f"Created {len(pairs)} training pairs.")
+    try:
+        token_ids: list[int] = tokens_to_ids(tokens, vocab.token_to_id)
+    except KeyError as exc:
+        LOG.error("Token not found in vocabulary: %s", exc.args[0])
+        return
+
+    # Step 4: Create training pairs (context-2 -> next) as three offset slices
+    # of the ID sequence: pair i is (prev_ids[i], curr_ids[i]) -> next_ids[i].
+    prev_ids: list[int] = token_ids[:-2]
+    curr_ids: list[int] = token_ids[1:-1]
+    next_ids: list[int] = token_ids[2:]
+    LOG.info("Created %d training pairs.", len(next_ids))
 
     # Step 5: Initialize model with zero weights (context-2 table lives in c_model.py).
     model: SimpleNextTokenModel = SimpleNextTokenModel(vocab_size=vocab_size)
 
     # Step 6: Train the model.
-    learning_rate: float = 0.1
+    learning_rate: float = 0.5
     epochs: int = 50
+    log_every: int = 1  # Raise (e.g., 10) to keep the log short for long runs.
 
     history: list[dict[str, float]] = train_model(
         model=model,
-        pairs=pairs,
+        prev_ids=prev_ids,
+        curr_ids=curr_ids,
+        next_ids=next_ids,
         learning_rate=learning_rate,
         epochs=epochs,
+        log_every=log_every,
     )
 
     # Step 7: Save training metrics for analysis.
@@ -108,12 +312,16 @@ def main() -> None:
         base_dir=BASE_DIR,
         corpus_path=DEFAULT_CORPUS_PATH,
         vocab=vocab,
-        model=model,
+        # write_artifacts is typed against the upstream model class; it only reads
+        # vocab_size and weights, which the local model provides in the same layout.
+        model=cast("UpstreamModel", model),
         model_kind="context2",
         learning_rate=learning_rate,
         epochs=epochs,
         row_labeler=row_labeler_context2(vocab, vocab_size),
     )
+    write_epoch_definition(META_PATH)
+    write_model_weights_bin(WEIGHTS_BIN_PATH, model, source_path=WEIGHTS_PATH)
 
     # Step 8: Qualitative check - what does the model predict after the first 2 tokens?
     previous_token: str = tokens[0]
@@ -124,13 +332,17 @@ def main() -> None:
         LOG.error("One of the sample tokens was not found in vocabulary.")
         return
 
-    probs: list[float] = model.forward(previous_id, current_id)
-    best_next_id: int = argmax(probs)
+    # argmax of the raw scores equals argmax of the softmax probabilities.
+    scores: array[float] = model.forward_logits(previous_id, current_id)
+    best_next_id: int = scores.index(max(scores))
     best_next_tok: str | None = vocab.get_id_token(best_next_id)
 
     LOG.info(
-        f"After training, most likely next token after {previous_token!r}|{current_token!r} "
-        f"is {best_next_tok!r} (ID: {best_next_id})."
+        "After training, most likely next token after %r|%r is %r (ID: %d).",
+        previous_token,
+        current_token,
+        best_next_tok,
+        best_next_id,
     )
 
 
@@ -6,7 +6,7 @@ Responsibilities:
 - Load inspectable training artifacts from artifacts/
   - 00_meta.json
   - 01_vocabulary.csv
-  - 02_model_weights.csv
+  - 02_model_weights.csv (or its binary copy, 02_model_weights.bin)
 - Reconstruct a vocabulary-like interface and model weights
 - Generate tokens using greedy decoding (argmax)
 - Print top-k next-token probabilities for inspection
@@ -14,28 +14,35 @@ Responsibilities:
 Notes:
 - This module does NOT retrain by default.
 - If artifacts are missing, run d_train.py first.
+- Weights are read from 02_model_weights.bin when it was written from the
+  current CSV (checked by the CSV's SHA-256 stored in the sidecar); that is a
+  single binary read instead of a text parse. Otherwise the CSV is parsed.
 
 - Context-2 bootstrapping: generation starts from a single start token.
   To form the first 2-token context, we use (start, start) as the initial context.
 """
 
 import argparse
+from array import array
+from collections.abc import Sequence
+import csv
+import hashlib
+import heapq
 import logging
 from pathlib import Path
+import sys
 from typing import Final
 
 from datafun_toolkit.logger import get_logger, log_header
-from toy_gpt_train.c_model import SimpleNextTokenModel
 from toy_gpt_train.e_infer import (
     ArtifactVocabulary,
-    generate_tokens_context2,
     load_meta,
-    load_model_weights_csv,
     load_vocabulary_csv,
     require_artifacts,
-    top_k,
 )
 
+from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+
 JsonScalar = str | int | float | bool | None
 JsonValue = JsonScalar | list["JsonValue"] | dict[str, "JsonValue"]
 JsonObject = dict[str, JsonValue]
@@ -47,6 +54,177 @@ ARTIFACTS_DIR: Final[Path] = BASE_DIR / "artifacts"
 META_PATH: Final[Path] = ARTIFACTS_DIR / "00_meta.json"
 VOCAB_PATH: Final[Path] = ARTIFACTS_DIR / "01_vocabulary.csv"
 WEIGHTS_PATH: Final[Path] = ARTIFACTS_DIR / "02_model_weights.csv"
+WEIGHTS_BIN_PATH: Final[Path] = ARTIFACTS_DIR / "02_model_weights.bin"
+
+
+def load_model_weights_csv(
+    path: Path,
+    vocab_size: int,
+    *,
+    expected_rows: int,
+) -> list[array[float]]:
+    """Load the weight table from a weights CSV artifact.
+
+    The file has one header row, then one row per context:
+    a label followed by vocab_size scores. Each row is parsed straight into
+    a float32 array by the C csv reader and float(), with no per-cell Python loop.
+
+    Raises:
+        ValueError: If the file is empty, the header is not
+            input_token plus vocab_size token columns, or the table does not
+            have expected_rows rows of vocab_size scores each.
+    """
+    with path.open(encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header: list[str] | None = next(reader, None)
+        if not header:
+            raise ValueError(f"Weights file is empty: {path}")
+        if header[0] != "input_token":
+            raise ValueError(
+                f"Expected first header column 'input_token' in {path}, "
+                f"found {header[0]!r}."
+            )
+        if len(header) != vocab_size + 1:
+            raise ValueError(
+                f"Expected {vocab_size} token columns in the header of {path}, "
+                f"found {len(header) - 1}."
+            )
+        weights: list[array[float]] = [
+            array("f", map(float, row[1:])) for row in reader if row
+        ]
+
+    if len(weights) != expected_rows:
+        raise ValueError(
+            f"Expected {expected_rows} weight rows in {path}, found {len(weights)}."
+        )
+    for row_idx, row in enumerate(weights):
+        if len(row) != vocab_size:
+            raise ValueError(
+                f"Expected {vocab_size} scores in row {row_idx} of {path}, "
+                f"found {len(row)}."
+            )
+    return weights
+
+
+def load_model_weights_bin(
+    path: Path,
+    vocab_size: int,
+    *,
+    source_path: Path,
+) -> list[array[float]]:
+    """Load the weight table from its raw little-endian float32 copy.
+
+    The file starts with the SHA-256 digest of the weights CSV it was written
+    from, followed by vocab_size**3 floats, row-major
+    (as written by d_train.write_model_weights_bin).
+
+    Raises:
+        ValueError: If the file size does not match vocab_size, or the stored
+            digest does not match the current contents of source_path.
+    """
+    digest_size: int = hashlib.sha256().digest_size
+    num_values: int = vocab_size**3
+    flat: array[float] = array("f")
+    expected_bytes: int = digest_size + num_values * flat.itemsize
+    actual_bytes: int = path.stat().st_size
+    if actual_bytes != expected_bytes:
+        raise ValueError(
+            f"Expected {expected_bytes} bytes in {path} for vocab size "
+            f"{vocab_size}, found {actual_bytes}."
+        )
+
+    source_digest: bytes = hashlib.sha256(source_path.read_bytes()).digest()
+    with path.open("rb") as f:
+        if f.read(digest_size) != source_digest:
+            raise ValueError(
+                f"{path} was not written from the current contents of {source_path}."
+            )
+        flat.fromfile(f, num_values)
+    if sys.byteorder != "little":
+        flat.byteswap()
+
+    return [flat[i : i + vocab_size] for i in range(0, num_values, vocab_size)]
+
+
+def load_model_weights(
+    csv_path: Path,
+    bin_path: Path,
+    vocab_size: int,
+) -> list[array[float]]:
+    """Load the weight table, preferring the binary copy when it is valid.
+
+    The binary copy is used only if it exists and matches csv_path
+    (see load_model_weights_bin); otherwise the CSV is parsed.
+
+    Raises:
+        ValueError: If the CSV has to be parsed and is malformed.
+    """
+    if bin_path.exists():
+        try:
+            return load_model_weights_bin(
+                bin_path,
+                vocab_size=vocab_size,
+                source_path=csv_path,
+            )
+        except ValueError as exc:
+            LOG.warning("Ignoring binary weights (%s); reading the CSV instead.", exc)
+    return load_model_weights_csv(
+        csv_path,
+        vocab_size=vocab_size,
+        expected_rows=vocab_size * vocab_size,
+    )
+
+
+def top_k(probs: Sequence[float], k: int) -> list[tuple[int, float]]:
+    """Return the k highest-probability (token_id, probability) pairs, best first.
+
+    Uses a size-k heap (O(V log k)) instead of sorting all V probabilities.
+    Ties keep the lower token ID first.
+    """
+    best_ids: list[int] = heapq.nlargest(k, range(len(probs)), key=probs.__getitem__)
+    return [(tok_id, probs[tok_id]) for tok_id in best_ids]
+
+
+def generate_tokens_context2(
+    model: SimpleNextTokenModel,
+    vocab: ArtifactVocabulary,
+    start_token: str,
+    num_tokens: int,
+) -> list[str]:
+    """Generate tokens greedily, bootstrapping the context as (start, start).
+
+    The loop keeps the context as two integer IDs and picks the next ID as
+    the argmax of the raw scores (the same token softmax would pick),
+    so no probabilities or strings are built per step.
+    Token strings are looked up once, at the end.
+
+    Returns:
+        The start token followed by num_tokens generated tokens
+        (just the start token if it is not in the vocabulary).
+        Generation stops early at an ID the vocabulary cannot map back.
+    """
+    start_id: int | None = vocab.get_token_id(start_token)
+    if start_id is None:
+        LOG.error("Start token not in vocabulary: %r", start_token)
+        return [start_token]
+
+    generated_ids: list[int] = [start_id]
+    previous_id: int = start_id
+    current_id: int = start_id
+    for _ in range(num_tokens):
+        scores: array[float] = model.forward_logits(previous_id, current_id)
+        next_id: int = scores.index(max(scores))
+        generated_ids.append(next_id)
+        previous_id, current_id = current_id, next_id
+
+    generated: list[str] = []
+    for tok_id in generated_ids:
+        tok: str | None = vocab.get_id_token(tok_id)
+        if tok is None:
+            LOG.error("Generated invalid token ID: %d", tok_id)
+            break
+        generated.append(tok)
+    return generated
 
 
 def parse_args() -> argparse.Namespace:
@@ -93,11 +271,7 @@ def main() -> None:
 
     v: int = vocab.vocab_size()
     model: SimpleNextTokenModel = SimpleNextTokenModel(vocab_size=v)
-    model.weights = load_model_weights_csv(
-        WEIGHTS_PATH,
-        vocab_size=v,
-        expected_rows=v * v,
-    )
+    model.weights = load_model_weights(WEIGHTS_PATH, WEIGHTS_BIN_PATH, vocab_size=v)
 
     args: argparse.Namespace = parse_args()
 
@@ -109,19 +283,22 @@ def main() -> None:
         start_token = vocab.id_to_token[first_id]
 
     LOG.info(
-        f"Loaded repo_name={meta.get('repo_name')} model_kind={meta.get('model_kind')}"
+        "Loaded repo_name=%s model_kind=%s",
+        meta.get("repo_name"),
+        meta.get("model_kind"),
     )
-    LOG.info(f"Vocab size: {v}")
-    LOG.info(f"Start token: {start_token}")
-    LOG.info(f"Context-2 bootstrap: ({start_token}, {start_token})")
+    LOG.info("Vocab size: %d", v)
+    LOG.info("Start token: %s", start_token)
+    LOG.info("Context-2 bootstrap: (%s, %s)", start_token, start_token)
 
+    # The top-k listing exists only to be logged; skip the work if INFO is off.
     start_id = vocab.get_token_id(start_token)
-    if start_id is not None:
+    if start_id is not None and LOG.isEnabledFor(logging.INFO):
         probs: list[float] = model.forward(start_id, start_id)
-        LOG.info(f"Top next-token predictions after {start_token}|{start_token}:")
+        LOG.info("Top next-token predictions after %s|%s:", start_token, start_token)
         for tok_id, prob in top_k(probs, k=max(1, args.topk)):
             tok = vocab.get_id_token(tok_id)
-            LOG.info(f"  {tok} (ID {tok_id}): {prob:.4f}")
+            LOG.info("  %s (ID %d): %.4f", tok, tok_id, prob)
 
     generated = generate_tokens_context2(
         model=model,
@@ -131,7 +308,7 @@ def main() -> None:
     )
 
     LOG.info("Generated sequence:")
-    LOG.info(f"  {' '.join(generated)}")
+    LOG.info("  %s", " ".join(generated))
 
 
 if __name__ == "__main__":
@@ -7,8 +7,11 @@ WHY: Minimal correctness requirement.
 """
 
 import importlib
+from pathlib import Path
 import sys
 
+import pytest
+
 PACKAGE_NAME = "toy_gpt_train_animals"  # CUSTOM: Use package name.
 
 # Modules that can run with no arguments
@@ -63,3 +66,299 @@ def test_demo_modules_with_args_import() -> None:
         module_path = f"{PACKAGE_NAME}.{module_name}"
         module = importlib.import_module(module_path)
         assert module is not None
+
+
+def test_group_context_targets_counts_next_tokens() -> None:
+    """
+    Test that pairs sharing a context row are collapsed into one histogram.
+
+    WHY: Training applies one update per unique row, so the counts
+         must add up to the original number of pairs.
+    """
+    from toy_gpt_train_animals.d_train import group_context_targets
+
+    groups = group_context_targets([7, 4, 4, 4], [1, 1, 2, 1])
+    assert groups == {4: {1: 2, 2: 1}, 7: {1: 1}}
+    assert list(groups) == [4, 7]  # Row order, not corpus order.
+    assert sum(sum(t.values()) for t in groups.values()) == 4
+
+
+def test_model_rows_are_independent() -> None:
+    """
+    Test that writing one weight row leaves every other row unchanged.
+
+    WHY: Training updates rows in place; rows must not share storage.
+    """
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+
+    model = SimpleNextTokenModel(vocab_size=3)
+    model.weights[model.row_index(0, 1)][2] = 1.0
+
+    assert model.forward_logits(0, 1).tolist() == [0.0, 0.0, 1.0]
+    assert all(
+        row.tolist() == [0.0, 0.0, 0.0]
+        for i, row in enumerate(model.weights)
+        if i != model.row_index(0, 1)
+    )
+
+
+def test_tokenizer_splits_on_any_whitespace(tmp_path: Path) -> None:
+    """
+    Test that tokens are split on spaces, tabs, and line breaks alike.
+
+    WHY: Corpus files mix spaces, tabs, and line breaks between words.
+    """
+    from toy_gpt_train_animals.a_tokenizer import SimpleTokenizer
+
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("the cat\tsat\n\n  on the mat \n", encoding="utf-8")
+
+    tokens = SimpleTokenizer(corpus_path=corpus).get_tokens()
+    assert tokens == ["the", "cat", "sat", "on", "the", "mat"]
+
+
+def test_train_model_converges_on_frequent_ambiguous_context() -> None:
+    """
+    Test that a context seen many times with two different next tokens converges.
+
+    WHY: Each row's step is averaged over its pairs, so a frequent context
+         must settle near the data's entropy instead of oscillating.
+    """
+    import math
+
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+    from toy_gpt_train_animals.d_train import train_model
+
+    num_pairs = 2000
+    next_ids = [1] * 1400 + [2] * 600  # 70% / 30% after the same context
+    model = SimpleNextTokenModel(vocab_size=3)
+
+    history = train_model(
+        model=model,
+        prev_ids=[0] * num_pairs,
+        curr_ids=[0] * num_pairs,
+        next_ids=next_ids,
+        learning_rate=0.5,
+        epochs=200,
+    )
+
+    losses = [row["avg_loss"] for row in history]
+    entropy = -(0.7 * math.log(0.7) + 0.3 * math.log(0.3))
+    assert all(b <= a + 1e-6 for a, b in zip(losses, losses[1:], strict=False))
+    assert abs(losses[-1] - entropy) < 0.01
+    assert history[-1]["accuracy"] == 0.7
+
+
+def test_train_model_log_every_records_sampled_epochs() -> None:
+    """
+    Test that log_every keeps every K-th epoch plus the first and last.
+
+    WHY: Long runs downsample the history; the endpoints must always remain.
+    """
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+    from toy_gpt_train_animals.d_train import train_model
+
+    def run(log_every: int) -> list[dict[str, float]]:
+        return train_model(
+            model=SimpleNextTokenModel(vocab_size=3),
+            prev_ids=[0, 1],
+            curr_ids=[1, 2],
+            next_ids=[2, 0],
+            learning_rate=0.5,
+            epochs=7,
+            log_every=log_every,
+        )
+
+    assert [row["epoch"] for row in run(3)] == [1, 3, 6, 7]
+
+    with pytest.raises(ValueError):
+        run(0)
+
+
+def test_train_model_without_pairs_reports_nan_loss() -> None:
+    """
+    Test that training on zero pairs reports NaN loss and zero accuracy.
+
+    WHY: A tiny corpus must not crash the demo with a ZeroDivisionError.
+    """
+    import math
+
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+    from toy_gpt_train_animals.d_train import train_model
+
+    history = train_model(
+        model=SimpleNextTokenModel(vocab_size=2),
+        prev_ids=[],
+        curr_ids=[],
+        next_ids=[],
+        learning_rate=0.5,
+        epochs=2,
+    )
+
+    assert [row["epoch"] for row in history] == [1, 2]
+    assert all(math.isnan(row["avg_loss"]) for row in history)
+    assert all(row["accuracy"] == 0.0 for row in history)
+
+
+def test_load_model_weights_csv_rejects_malformed_files(tmp_path: Path) -> None:
+    """
+    Test that a weights CSV with a bad header or shape raises ValueError.
+
+    WHY: Inference must fail loudly rather than run on misaligned weights.
+    """
+    from toy_gpt_train_animals.e_infer import load_model_weights_csv
+
+    good_header = "input_token,a,b\n"
+    good_rows = "a|a,0,0\na|b,0,0\nb|a,0,0\nb|b,0,0\n"
+    cases = {
+        "empty.csv": "",
+        "label.csv": "context,a,b\n" + good_rows,
+        "width.csv": "input_token,a,b,c\n" + good_rows,
+        "rows.csv": good_header + "a|a,0,0\n",
+        "scores.csv": good_header + good_rows.replace("b|b,0,0", "b|b,0"),
+    }
+    for name, text in cases.items():
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        with pytest.raises(ValueError):
+            load_model_weights_csv(path, vocab_size=2, expected_rows=4)
+
+    path = tmp_path / "good.csv"
+    path.write_text(good_header + good_rows, encoding="utf-8")
+    assert len(load_model_weights_csv(path, vocab_size=2, expected_rows=4)) == 4
+
+
+def test_top_k_orders_by_probability_then_token_id() -> None:
+    """
+    Test that top_k returns the best k pairs, best first, ties by lower ID.
+
+    WHY: The inference listing relies on this deterministic order.
+    """
+    from toy_gpt_train_animals.e_infer import top_k
+
+    assert top_k([0.2, 0.5, 0.2, 0.1], k=3) == [(1, 0.5), (0, 0.2), (2, 0.2)]
+    assert top_k([0.2, 0.5], k=5) == [(1, 0.5), (0, 0.2)]
+
+
+def test_model_weights_bin_round_trips_csv(tmp_path: Path) -> None:
+    """
+    Test that the binary weights sidecar loads back identical to the CSV.
+
+    WHY: Inference prefers the sidecar, so it must match the inspectable CSV.
+    """
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+    from toy_gpt_train_animals.d_train import write_model_weights_bin
+    from toy_gpt_train_animals.e_infer import (
+        VOCAB_PATH,
+        WEIGHTS_PATH,
+        load_model_weights_bin,
+        load_model_weights_csv,
+        load_vocabulary_csv,
+    )
+
+    v = load_vocabulary_csv(VOCAB_PATH).vocab_size()
+    csv_weights = load_model_weights_csv(
+        WEIGHTS_PATH, vocab_size=v, expected_rows=v * v
+    )
+    model = SimpleNextTokenModel(vocab_size=v)
+    model.weights = csv_weights
+
+    bin_path = tmp_path / "weights.bin"
+    write_model_weights_bin(bin_path, model, source_path=WEIGHTS_PATH)
+
+    loaded = load_model_weights_bin(bin_path, vocab_size=v, source_path=WEIGHTS_PATH)
+    assert loaded == csv_weights
+
+
+def test_load_model_weights_bin_rejects_wrong_size_or_source(tmp_path: Path) -> None:
+    """
+    Test that a sidecar for another vocabulary or another CSV raises ValueError.
+
+    WHY: A stale sidecar must never be misread as the current weights.
+    """
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+    from toy_gpt_train_animals.d_train import write_model_weights_bin
+    from toy_gpt_train_animals.e_infer import load_model_weights_bin
+
+    source = tmp_path / "weights.csv"
+    source.write_text("input_token,a,b\n", encoding="utf-8")
+    bin_path = tmp_path / "weights.bin"
+    write_model_weights_bin(
+        bin_path, SimpleNextTokenModel(vocab_size=2), source_path=source
+    )
+
+    with pytest.raises(ValueError):
+        load_model_weights_bin(bin_path, vocab_size=3, source_path=source)
+
+    source.write_text("input_token,a,c\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_model_weights_bin(bin_path, vocab_size=2, source_path=source)
+
+
+def test_infer_main_uses_sidecar_only_when_it_matches_the_csv(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that inference reads the sidecar when it is current and the CSV otherwise.
+
+    WHY: Editing or regenerating the CSV must never leave inference running
+         on stale binary weights, and a bad sidecar must not abort inference.
+    """
+    from array import array
+    from collections.abc import Callable
+    import shutil
+
+    from toy_gpt_train_animals import e_infer
+    from toy_gpt_train_animals.c_model import SimpleNextTokenModel
+    from toy_gpt_train_animals.d_train import write_model_weights_bin
+
+    for name in ("META_PATH", "VOCAB_PATH", "WEIGHTS_PATH"):
+        copy = tmp_path / getattr(e_infer, name).name
+        shutil.copyfile(getattr(e_infer, name), copy)
+        monkeypatch.setattr(e_infer, name, copy)
+    csv_path = e_infer.WEIGHTS_PATH
+    bin_path = tmp_path / "02_model_weights.bin"
+    monkeypatch.setattr(e_infer, "WEIGHTS_BIN_PATH", bin_path)
+    monkeypatch.setattr(sys, "argv", ["e_infer"])
+
+    # Record which loader actually returned the weights.
+    loaded: list[str] = []
+
+    def spy(name: str) -> Callable[..., list[array[float]]]:
+        load = getattr(e_infer, name)
+
+        def wrapper(*args: object, **kwargs: object) -> list[array[float]]:
+            weights = load(*args, **kwargs)
+            loaded.append(name)
+            return weights
+
+        return wrapper
+
+    for name in ("load_model_weights_bin", "load_model_weights_csv"):
+        monkeypatch.setattr(e_infer, name, spy(name))
+
+    def run_main() -> list[str]:
+        loaded.clear()
+        e_infer.main()
+        return list(loaded)
+
+    assert run_main() == ["load_model_weights_csv"]  # No sidecar yet.
+
+    v = e_infer.load_vocabulary_csv(e_infer.VOCAB_PATH).vocab_size()
+    model = SimpleNextTokenModel(vocab_size=v)
+    model.weights = e_infer.load_model_weights_csv(
+        csv_path, vocab_size=v, expected_rows=v * v
+    )
+    write_model_weights_bin(bin_path, model, source_path=csv_path)
+    assert run_main() == ["load_model_weights_bin"]
+
+    # Any change to the CSV (here, a trailing blank line) invalidates the sidecar.
+    with csv_path.open("a", encoding="utf-8") as f:
+        f.write("\n")
+    assert run_main() == ["load_model_weights_csv"]
+
+    # A sidecar for a different vocabulary size falls back instead of failing.
+    write_model_weights_bin(
+        bin_path, SimpleNextTokenModel(vocab_size=2), source_path=csv_path
+    )
+    assert run_main() == ["load_model_weights_csv"]